@@ -1,94 +1,146 @@
+import functools
 import os
+import time
+import ahocorasick
+import orjson
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from starlette.routing import Route
 from typing import List, Optional, Dict, Any
 
-app = FastAPI(title="AI Automation Agency API", version="1.0.0")
+app = FastAPI(title="AI Automation Agency API", version="1.0.0", default_response_class=ORJSONResponse)
+
+# CORS is handled inline instead of via CORSMiddleware: the API is fully
+# public, so every response carries the wildcard header and one cached
+# preflight response serves all OPTIONS requests. This drops the
+# middleware's per-request origin matching from every hot path.
+_CORS_HEADERS = {
+    "access-control-allow-origin": "*",
+    "access-control-allow-methods": "GET, POST, OPTIONS",
+    "access-control-allow-headers": "*",
+}
+
+_PREFLIGHT = Response(status_code=204, headers=_CORS_HEADERS)
+
+@app.options("/{path:path}", include_in_schema=False)
+def cors_preflight(path: str):
+    return _PREFLIGHT
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
 # -----------------------------
 # Health
 # -----------------------------
-@app.get("/")
-def read_root():
-    return {"message": "AI Automation Agency Backend Running"}
+# The health endpoints are constant, so they are registered as raw
+# Starlette routes returning a shared precomputed Response: a hit is just
+# route match -> send, with no dependency injection or encoding.
+_ROOT_RESP = Response(
+    orjson.dumps({"message": "AI Automation Agency Backend Running"}),
+    media_type="application/json",
+    headers=_CORS_HEADERS,
+)
+_HELLO_RESP = Response(
+    orjson.dumps({"message": "Hello from the backend API!"}),
+    media_type="application/json",
+    headers=_CORS_HEADERS,
+)
 
-@app.get("/api/hello")
-def hello():
-    return {"message": "Hello from the backend API!"}
+async def read_root(request):
+    return _ROOT_RESP
+
+async def hello(request):
+    return _HELLO_RESP
+
+app.router.routes.append(Route("/", read_root, methods=["GET"]))
+app.router.routes.append(Route("/api/hello", hello, methods=["GET"]))
 
 
 # -----------------------------
 # Database diagnostic
 # -----------------------------
+# Resolve the database handle once at import instead of re-importing (and
+# potentially re-raising) inside every /test call.
+try:
+    from database import db as _db
+    _DB_IMPORT_ERROR = None
+except ImportError:
+    _db = None
+    _DB_IMPORT_ERROR = "❌ Database module not found (run enable-database first)"
+except Exception as e:
+    _db = None
+    _DB_IMPORT_ERROR = f"❌ Error: {str(e)[:50]}"
+
+# list_collection_names() is a MongoDB round-trip; /test is a diagnostic
+# endpoint that doesn't need freshness, so cache the result for 30s.
+# The environment doesn't change at runtime; evaluate the checks once.
+_DB_URL_SET = "✅ Set" if os.getenv("DATABASE_URL") else "❌ Not Set"
+_DB_NAME_SET = "✅ Set" if os.getenv("DATABASE_NAME") else "❌ Not Set"
+
+_COLLECTIONS_TTL = 30.0
+_collections_cache: Optional[List[str]] = None
+_collections_cache_ts = 0.0
+
+def _list_collections_cached():
+    global _collections_cache, _collections_cache_ts
+    now = time.monotonic()
+    if _collections_cache is None or now - _collections_cache_ts >= _COLLECTIONS_TTL:
+        _collections_cache = _db.list_collection_names()
+        _collections_cache_ts = now
+    return _collections_cache
+
+
+# Response skeleton built once; handlers copy it and overwrite only the
+# fields that vary. The "collections" list is shared but only ever
+# rebound, never mutated.
+_TEST_TEMPLATE = {
+    "backend": "✅ Running",
+    "database": "❌ Not Available",
+    "database_url": _DB_URL_SET,
+    "database_name": _DB_NAME_SET,
+    "connection_status": "Not Connected",
+    "collections": []
+}
+
+
 @app.get("/test")
 def test_database():
     """Test endpoint to check if database is available and accessible"""
-    response = {
-        "backend": "✅ Running",
-        "database": "❌ Not Available",
-        "database_url": None,
-        "database_name": None,
-        "connection_status": "Not Connected",
-        "collections": []
-    }
-    try:
-        from database import db
-        if db is not None:
-            response["database"] = "✅ Available"
-            response["database_url"] = "✅ Configured"
-            response["database_name"] = db.name if hasattr(db, 'name') else "✅ Connected"
-            response["connection_status"] = "Connected"
-            try:
-                collections = db.list_collection_names()
-                response["collections"] = collections[:10]
-                response["database"] = "✅ Connected & Working"
-            except Exception as e:
-                response["database"] = f"⚠️  Connected but Error: {str(e)[:50]}"
-        else:
-            response["database"] = "⚠️  Available but not initialized"
-    except ImportError:
-        response["database"] = "❌ Database module not found (run enable-database first)"
-    except Exception as e:
-        response["database"] = f"❌ Error: {str(e)[:50]}"
-
-    import os
-    response["database_url"] = "✅ Set" if os.getenv("DATABASE_URL") else "❌ Not Set"
-    response["database_name"] = "✅ Set" if os.getenv("DATABASE_NAME") else "❌ Not Set"
-    return response
+    response = _TEST_TEMPLATE.copy()
+    if _DB_IMPORT_ERROR is not None:
+        response["database"] = _DB_IMPORT_ERROR
+    elif _db is not None:
+        response["database"] = "✅ Available"
+        response["connection_status"] = "Connected"
+        try:
+            collections = _list_collections_cached()
+            response["collections"] = collections[:10]
+            response["database"] = "✅ Connected & Working"
+        except Exception as e:
+            response["database"] = f"⚠️  Connected but Error: {str(e)[:50]}"
+    else:
+        response["database"] = "⚠️  Available but not initialized"
+
+    return ORJSONResponse(response, headers=_CORS_HEADERS)
 
 
 # -----------------------------
 # Data models for simple content endpoints
 # -----------------------------
-class TeamMember(BaseModel):
-    name: str
-    role: str
-    bio: str
-    avatar: Optional[str] = None
-    socials: Dict[str, str] = {}
-
-class CaseStudy(BaseModel):
-    client: str
-    industry: str
-    challenge: str
-    solution: str
-    impact_metrics: Dict[str, Any]
-
 class QuizInput(BaseModel):
     industry: str = Field(..., description="e.g., ecommerce, finance, saas, healthcare")
     company_size: str = Field(..., description="e.g., startup, smb, midmarket, enterprise")
     primary_goal: str = Field(..., description="e.g., lead-gen, support, operations, analytics")
 
+    @field_validator("industry", "company_size", "primary_goal", mode="before")
+    @classmethod
+    def _normalize(cls, v):
+        # Store canonical lowercase values so the lookup tables hit directly.
+        return v.strip().lower() if isinstance(v, str) else v
+
+# Frozen: instances are built once at import and only ever serialized.
 class Recommendation(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     title: str
     description: str
     icon: str
@@ -111,27 +163,30 @@ TECHNOLOGIES = [
     {"name": "MLOps", "icon": "Settings"},
 ]
 
-TEAM: List[TeamMember] = [
-    TeamMember(name="Ava van Rijn", role="Head of AI Strategy", bio="Ontwerpt schaalbare AI-roadmaps voor impact.", avatar="/avatars/ava.png", socials={"linkedin": "#"}),
-    TeamMember(name="Milan de Groot", role="Lead ML Engineer", bio="Production-grade ML met focus op betrouwbaarheid.", avatar="/avatars/milan.png", socials={"linkedin": "#"}),
-    TeamMember(name="Noa Janssen", role="Automation Architect", bio="RPA en integraties die processen laten stromen.", avatar="/avatars/noa.png", socials={"linkedin": "#"}),
+# Team and case-study content is plain data: it's only ever serialized,
+# never validated or mutated downstream, so skip Pydantic model
+# construction and keep it as dict literals.
+TEAM = [
+    {"name": "Ava van Rijn", "role": "Head of AI Strategy", "bio": "Ontwerpt schaalbare AI-roadmaps voor impact.", "avatar": "/avatars/ava.png", "socials": {"linkedin": "#"}},
+    {"name": "Milan de Groot", "role": "Lead ML Engineer", "bio": "Production-grade ML met focus op betrouwbaarheid.", "avatar": "/avatars/milan.png", "socials": {"linkedin": "#"}},
+    {"name": "Noa Janssen", "role": "Automation Architect", "bio": "RPA en integraties die processen laten stromen.", "avatar": "/avatars/noa.png", "socials": {"linkedin": "#"}},
 ]
 
-CASE_STUDIES: List[CaseStudy] = [
-    CaseStudy(
-        client="Nova Retail",
-        industry="E-commerce",
-        challenge="Hoge workload bij customer support en trage responstijden.",
-        solution="NLP-gedreven virtuele agent en auto-triage met RPA.",
-        impact_metrics={"CSAT": "+18%", "First Response": "-62%", "Hours Saved/mo": 450},
-    ),
-    CaseStudy(
-        client="FinOptima",
-        industry="Financieel",
-        challenge="Handmatige rapportage en compliance processen.",
-        solution="Automatische document parsing en ML-anomalie detectie.",
-        impact_metrics={"Reporting Time": "-70%", "Accuracy": "+2.3%"},
-    ),
+CASE_STUDIES = [
+    {
+        "client": "Nova Retail",
+        "industry": "E-commerce",
+        "challenge": "Hoge workload bij customer support en trage responstijden.",
+        "solution": "NLP-gedreven virtuele agent en auto-triage met RPA.",
+        "impact_metrics": {"CSAT": "+18%", "First Response": "-62%", "Hours Saved/mo": 450},
+    },
+    {
+        "client": "FinOptima",
+        "industry": "Financieel",
+        "challenge": "Handmatige rapportage en compliance processen.",
+        "solution": "Automatische document parsing en ML-anomalie detectie.",
+        "impact_metrics": {"Reporting Time": "-70%", "Accuracy": "+2.3%"},
+    },
 ]
 
 SERVICE_LIBRARY: List[Recommendation] = [
@@ -143,107 +198,191 @@ SERVICE_LIBRARY: List[Recommendation] = [
 ]
 
 
+# Static data never changes at runtime, so serialize it once at import
+# instead of paying jsonable_encoder + json.dumps on every request.
+_TECH_JSON = orjson.dumps(TECHNOLOGIES)
+_TEAM_JSON = orjson.dumps(TEAM)
+_CASE_STUDIES_JSON = orjson.dumps(CASE_STUDIES)
+
+
 # -----------------------------
 # Public content endpoints
 # -----------------------------
-@app.get("/api/technologies")
-def get_technologies():
-    return TECHNOLOGIES
+# Technologies is constant like the health endpoints: serve one shared
+# Response through a raw Starlette route.
+_TECH_RESP = Response(_TECH_JSON, media_type="application/json", headers=_CORS_HEADERS)
 
-@app.get("/api/team", response_model=List[TeamMember])
+async def get_technologies(request):
+    return _TECH_RESP
+
+app.router.routes.append(Route("/api/technologies", get_technologies, methods=["GET"]))
+
+@app.get("/api/team")
 def get_team():
-    return TEAM
+    return Response(_TEAM_JSON, media_type="application/json", headers=_CORS_HEADERS)
 
-@app.get("/api/case-studies", response_model=List[CaseStudy])
+@app.get("/api/case-studies")
 def get_case_studies():
-    return CASE_STUDIES
+    return Response(_CASE_STUDIES_JSON, media_type="application/json", headers=_CORS_HEADERS)
 
 
 # -----------------------------
 # Quiz-based recommendation
 # -----------------------------
-@app.post("/api/recommend", response_model=List[Recommendation])
+# Answer -> SERVICE_LIBRARY index bitmask, built once so each request
+# resolves with three O(1) dict lookups instead of sequential list
+# membership tests. Bit i stands for SERVICE_LIBRARY[i]; OR-ing masks
+# dedups overlapping answers for free.
+_GOAL_MASK: Dict[str, int] = {
+    "support": 1 << 0, "customer support": 1 << 0, "cs": 1 << 0,
+    "lead-gen": 1 << 1, "marketing": 1 << 1, "growth": 1 << 1, "revenue": 1 << 1,
+    "analytics": 1 << 4, "insights": 1 << 4, "reporting": 1 << 4,
+    "operations": 1 << 3, "efficiency": 1 << 3, "process": 1 << 3,
+}
+
+_INDUSTRY_MASK: Dict[str, int] = {
+    "ecommerce": 1 << 2, "e-commerce": 1 << 2,
+    "finance": 1 << 2, "fintech": 1 << 2, "financial": 1 << 2,
+}
+
+_SIZE_MASK: Dict[str, int] = {
+    "enterprise": 1 << 3, "midmarket": 1 << 3,
+}
+
+# Balanced trio when no answer matches
+_FALLBACK_MASK = (1 << 2) | (1 << 0) | (1 << 4)
+
+# Library indices in priority order, computed once so results come out
+# sorted without a per-request sorted() call.
+_SORTED_IDX = sorted(range(len(SERVICE_LIBRARY)), key=lambda i: SERVICE_LIBRARY[i].priority)
+
+# Dump each service to a dict exactly once; everything downstream works
+# on these instead of re-serializing the models.
+_SERVICE_DICTS = [r.model_dump() for r in SERVICE_LIBRARY]
+
+# With only 2^5 possible result subsets, serialize every one of them at
+# import; the endpoint then degenerates to a dict lookup. Mask 0 (no
+# answer matched) serves the fallback trio.
+_RESP_CACHE: Dict[int, bytes] = {
+    mask: orjson.dumps([
+        _SERVICE_DICTS[i]
+        for i in _SORTED_IDX
+        if (mask or _FALLBACK_MASK) & (1 << i)
+    ])
+    for mask in range(1 << len(SERVICE_LIBRARY))
+}
+
+
+@app.post("/api/recommend")
 def recommend(payload: QuizInput):
-    industry = payload.industry.lower()
-    size = payload.company_size.lower()
-    goal = payload.primary_goal.lower()
-
-    results: List[Recommendation] = []
-
-    if goal in ["support", "customer support", "cs"]:
-        results.append(SERVICE_LIBRARY[0])
-    if goal in ["lead-gen", "marketing", "growth", "revenue"]:
-        results.append(SERVICE_LIBRARY[1])
-    if goal in ["analytics", "insights", "reporting"]:
-        results.append(SERVICE_LIBRARY[4])
-    if goal in ["operations", "efficiency", "process"]:
-        results.append(SERVICE_LIBRARY[3])
-
-    if industry in ["ecommerce", "e-commerce"]:
-        results.append(SERVICE_LIBRARY[2])
-    if industry in ["finance", "fintech", "financial"]:
-        results.append(SERVICE_LIBRARY[2])
-
-    if size in ["enterprise", "midmarket"]:
-        results.append(SERVICE_LIBRARY[3])
-
-    # Fallback to a balanced trio if empty
-    if not results:
-        results = [SERVICE_LIBRARY[2], SERVICE_LIBRARY[0], SERVICE_LIBRARY[4]]
+    mask = (
+        _GOAL_MASK.get(payload.primary_goal, 0)
+        | _INDUSTRY_MASK.get(payload.industry, 0)
+        | _SIZE_MASK.get(payload.company_size, 0)
+    )
 
-    # Unique by title, sorted by priority
-    dedup: Dict[str, Recommendation] = {rec.title: rec for rec in results}
-    return sorted(dedup.values(), key=lambda r: r.priority)
+    return Response(_RESP_CACHE[mask], media_type="application/json", headers=_CORS_HEADERS)
 
 
 # -----------------------------
 # Simple rule-based chatbot
 # -----------------------------
-@app.post("/api/chatbot")
-def chatbot(msg: ChatbotMessage):
-    text = (msg.message or "").lower()
-    def reply(content: str, intent: str = "general", suggestions: Optional[List[str]] = None):
-        return {"reply": content, "intent": intent, "suggestions": suggestions or []}
-
-    if any(k in text for k in ["prijs", "kosten", "tarief", "offerte", "pricing", "price"]):
-        return reply(
-            "Onze trajecten starten doorgaans vanaf €8.000 voor een pilot. Voor langdurige implementaties werken we met vaste sprints of een retainer. Zal ik een korte intake van 15 min inplannen?",
+# Intent rules in priority order (lower index wins, mirroring the old
+# if-chain). Replies are prebuilt dicts shared across requests: they are
+# never mutated, only serialized, so returning the same reference is safe
+# and saves a dict + list allocation per reply.
+_CHATBOT_RULES = [
+    (
+        ["prijs", "kosten", "tarief", "offerte", "pricing", "price"],
+        dict(
+            reply="Onze trajecten starten doorgaans vanaf €8.000 voor een pilot. Voor langdurige implementaties werken we met vaste sprints of een retainer. Zal ik een korte intake van 15 min inplannen?",
             intent="pricing",
             suggestions=["Plan een intake", "Stuur prijslijst", "Meer over pakketten"],
-        )
-    if any(k in text for k in ["implement", "implementatie", "hoe werkt", "proces", "stappen"]):
-        return reply(
-            "We starten met een AI Discovery (1-2 weken), vervolgens een pilot (4-6 weken) en daarna schaalvergroting. Alles is meetbaar met KPI’s en dashboards.",
+        ),
+    ),
+    (
+        ["implement", "implementatie", "hoe werkt", "proces", "stappen"],
+        dict(
+            reply="We starten met een AI Discovery (1-2 weken), vervolgens een pilot (4-6 weken) en daarna schaalvergroting. Alles is meetbaar met KPI’s en dashboards.",
             intent="process",
             suggestions=["Start Discovery", "Bekijk voorbeelden", "Meetbare KPI’s"],
-        )
-    if any(k in text for k in ["support", "klantenservice", "customer service", "helpdesk"]):
-        return reply(
-            "Voor support automatisering combineren we NLP met workflow-automatisering (RPA). Gemiddeld reduceren we responstijden met 50-70%.",
+        ),
+    ),
+    (
+        ["support", "klantenservice", "customer service", "helpdesk"],
+        dict(
+            reply="Voor support automatisering combineren we NLP met workflow-automatisering (RPA). Gemiddeld reduceren we responstijden met 50-70%.",
             intent="service-support",
             suggestions=["Plan demo virtuele agent", "Zie case retail", "Integraties"],
-        )
-    if any(k in text for k in ["marketing", "lead", "campagne", "growth"]):
-        return reply(
-            "We bouwen scoring-modellen, personalisatie en journey-automatisering. Dit leidt vaak tot +10-25% conversie uplift.",
+        ),
+    ),
+    (
+        ["marketing", "lead", "campagne", "growth"],
+        dict(
+            reply="We bouwen scoring-modellen, personalisatie en journey-automatisering. Dit leidt vaak tot +10-25% conversie uplift.",
             intent="service-marketing",
             suggestions=["Plan marketing audit", "Voorbeeldflows", "CDP integratie"],
-        )
-    if any(k in text for k in ["ml", "machine learning", "model", "ai"]):
-        return reply(
-            "We ontwikkelen productierijpe ML met MLOps best practices: monitoring, retraining en CI/CD voor modellen.",
+        ),
+    ),
+    (
+        ["ml", "machine learning", "model", "ai"],
+        dict(
+            reply="We ontwikkelen productierijpe ML met MLOps best practices: monitoring, retraining en CI/CD voor modellen.",
             intent="service-ml",
             suggestions=["Architectuur voorbeelden", "Security & compliance", "Roadmap sessie"],
-        )
-    # Default
-    return reply(
-        "Hi! Ik ben je AI-assistent. Stel me een vraag over onze diensten, implementatie of prijzen, of vraag om een intake.",
-        intent="general",
-        suggestions=["Wat kost een pilot?", "Hoe ziet het proces eruit?", "Welke cases hebben jullie?"],
-    )
+        ),
+    ),
+]
+
+_DEFAULT_REPLY = dict(
+    reply="Hi! Ik ben je AI-assistent. Stel me een vraag over onze diensten, implementatie of prijzen, of vraag om een intake.",
+    intent="general",
+    suggestions=["Wat kost een pilot?", "Hoe ziet het proces eruit?", "Welke cases hebben jullie?"],
+)
+
+# One Aho-Corasick automaton over all keywords: a single linear scan of the
+# message replaces one substring search per keyword per rule. Keywords are
+# lowercased at build time so case-insensitivity costs exactly one
+# str.lower() of the incoming message — no re-casing during the scan.
+_CHATBOT_AUTOMATON = ahocorasick.Automaton()
+for _prio, (_keywords, _payload) in enumerate(_CHATBOT_RULES):
+    for _kw in _keywords:
+        _CHATBOT_AUTOMATON.add_word(_kw.lower(), (_prio, _payload))
+_CHATBOT_AUTOMATON.make_automaton()
+
+
+# Replies are a pure function of the normalized message and come from a
+# small fixed set, so repeat questions (common for demo traffic) resolve
+# from the cache without touching the automaton. Safe to cache because
+# the reply dicts are shared and never mutated.
+@functools.lru_cache(maxsize=512)
+def _match_reply(text: str) -> dict:
+    best = None
+    for _, (prio, payload) in _CHATBOT_AUTOMATON.iter(text):
+        if best is None or prio < best[0]:
+            best = (prio, payload)
+            if prio == 0:
+                break
+    return best[1] if best else _DEFAULT_REPLY
+
+
+@app.post("/api/chatbot")
+def chatbot(msg: ChatbotMessage):
+    # Empty/whitespace messages can't match anything; skip the scan.
+    if not msg.message or not msg.message.strip():
+        return ORJSONResponse(_DEFAULT_REPLY, headers=_CORS_HEADERS)
+    return ORJSONResponse(_match_reply(msg.message.strip().lower()), headers=_CORS_HEADERS)
 
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        backlog=4096,
+    )